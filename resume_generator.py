@@ -1,84 +1,251 @@
 
 import os
+import re
 import json
+import asyncio
+import httpx
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    _loads = json.loads
 
 # Paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BASE_DIR
-PROFILE_PATH = os.path.join(PROJECT_ROOT, "config", "profile.json")
-OUTPUT_DIR = os.path.join(PROJECT_ROOT, "resumes", "generated")
+PROFILE_PATH = PROJECT_ROOT / "config" / "profile.json"
+OUTPUT_DIR = PROJECT_ROOT / "resumes" / "generated"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Ollama config
 OLLAMA_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "llama3.1"  # change if needed
-
-
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))  # seconds per attempt
+OLLAMA_RETRIES = 3
+# Max concurrent requests; match the server's OLLAMA_NUM_PARALLEL (see below)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))
+
+# Multi-resume batching: jobs of the same language share one prompt
+RESUME_SEP = "===RESUME_SEP==="
+MAX_BATCH_SIZE = 5  # keeps the combined prompt and output within the context window
+
+# Reuse one keep-alive connection pool for all sync Ollama calls
+# (generate_tailored_resume); generate_all pools through httpx instead
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+# Batch generation keeps up to OLLAMA_NUM_PARALLEL requests in flight and
+# queues the rest client-side, so queued jobs don't run into OLLAMA_TIMEOUT.
+# To let the server actually work on them in parallel, start it with e.g.:
+#   OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=1 ollama serve
+# and export the same OLLAMA_NUM_PARALLEL for this script.
+
+# Characters dropped from generated filenames (keeps letters, digits and "-_.() ")
+_SANITIZE_RE = re.compile(r"[^\w\-.() ]+")
+
+# Language detection markers (matched against whole lowercase words)
+_TOKEN_RE = re.compile(r"[a-zA-ZäöüÄÖÜß]+")
+
+# Common German function words / patterns
+_GERMAN = frozenset({
+    "und", "der", "die", "das", "mit", "für", "bei", "nicht",
+    "entwickeln", "bewerben", "kenntnisse", "erfahrung",
+    "arbeitgeber", "bereich", "teamfähig", "studium",
+    "werkstudent", "praktikum"
+})
+
+_ENGLISH = frozenset({
+    "and", "the", "with", "for", "software", "engineer",
+    "responsibilities", "requirements", "experience",
+    "working", "internship"
+})
+
+
+@lru_cache(maxsize=1)
 def load_profile():
     with open(PROFILE_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=1)
+def load_profile_text() -> str:
+    """
+    Profile serialized for prompts; computed once per process.
+    """
+    return _dumps(load_profile())
+
+
 def call_ollama(prompt: str) -> str:
     """
     Call local Ollama model and return the generated text (non-streaming).
+    Timed-out or dropped requests are retried with exponential backoff.
+    """
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": False
+    }
+    for attempt in range(OLLAMA_RETRIES):
+        try:
+            resp = _SESSION.post(OLLAMA_URL, json=payload, timeout=OLLAMA_TIMEOUT)
+            break
+        except (requests.Timeout, requests.ConnectionError) as e:
+            if attempt == OLLAMA_RETRIES - 1:
+                raise
+            print(f"⚠️  Ollama request failed ({e}), retrying...")
+            time.sleep(2 ** attempt)
+    resp.raise_for_status()
+    data = resp.json()
+    return data.get("response", "")
+
+
+async def call_ollama_async(prompt: str, client: httpx.AsyncClient, timeout: float = None) -> str:
+    """
+    Async variant of call_ollama, sharing the connection pool of `client`.
+    `timeout` overrides OLLAMA_TIMEOUT per attempt.
     """
     payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
         "stream": False
     }
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=180)
+    for attempt in range(OLLAMA_RETRIES):
+        try:
+            resp = await asyncio.wait_for(
+                client.post(OLLAMA_URL, json=payload, timeout=None),
+                timeout=timeout or OLLAMA_TIMEOUT
+            )
+            break
+        except (asyncio.TimeoutError, httpx.TransportError) as e:
+            if attempt == OLLAMA_RETRIES - 1:
+                raise
+            print(f"⚠️  Ollama request failed ({e!r}), retrying...")
+            await asyncio.sleep(2 ** attempt)
     resp.raise_for_status()
     data = resp.json()
     return data.get("response", "")
 
 
+def call_ollama_stream(prompt: str, out_file) -> None:
+    """
+    Stream the generated text from the local Ollama model straight into
+    `out_file` as tokens arrive. OLLAMA_TIMEOUT bounds the wait between
+    chunks; a failed attempt truncates `out_file` and starts over.
+    """
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": True
+    }
+    for attempt in range(OLLAMA_RETRIES):
+        try:
+            with _SESSION.post(OLLAMA_URL, json=payload, stream=True, timeout=OLLAMA_TIMEOUT) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    chunk = _loads(line)
+                    out_file.write(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+            return
+        except (requests.Timeout, requests.ConnectionError) as e:
+            if attempt == OLLAMA_RETRIES - 1:
+                raise
+            print(f"⚠️  Ollama stream failed ({e}), retrying...")
+            out_file.seek(0)
+            out_file.truncate()
+            time.sleep(2 ** attempt)
+
+
+async def call_ollama_stream_async(prompt: str, client: httpx.AsyncClient, out_file) -> None:
+    """
+    Async variant of call_ollama_stream, sharing the connection pool of `client`.
+    """
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": True
+    }
+    for attempt in range(OLLAMA_RETRIES):
+        try:
+            async with client.stream("POST", OLLAMA_URL, json=payload, timeout=OLLAMA_TIMEOUT) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = _loads(line)
+                    out_file.write(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+            return
+        except httpx.TransportError as e:
+            if attempt == OLLAMA_RETRIES - 1:
+                raise
+            print(f"⚠️  Ollama stream failed ({e!r}), retrying...")
+            out_file.seek(0)
+            out_file.truncate()
+            await asyncio.sleep(2 ** attempt)
+
+
+@lru_cache(maxsize=512)
 def detect_language(text: str) -> str:
     """
     Very simple heuristic language detection between English and German.
     Returns "English" or "German".
     """
-    t = (text or "").lower()
+    toks = {m.group(0).lower() for m in _TOKEN_RE.finditer(text or "")}
 
-    # Common German function words / patterns
-    german_markers = [
-        "und", "der", "die", "das", "mit", "für", "bei", "nicht",
-        "entwickeln", "bewerben", "kenntnisse", "erfahrung",
-        "arbeitgeber", "bereich", "teamfähig", "studium",
-        "werkstudent", "praktikum"
-    ]
-
-    english_markers = [
-        "and", "the", "with", "for", "software", "engineer",
-        "responsibilities", "requirements", "experience",
-        "working student", "internship"
-    ]
-
-    german_score = sum(1 for w in german_markers if w in t)
-    english_score = sum(1 for w in english_markers if w in t)
-
-    if german_score > english_score:
+    if len(toks & _GERMAN) > len(toks & _ENGLISH):
         return "German"
     else:
         return "English"
 
 
-def build_resume_prompt(profile: dict, job: dict, target_language: str) -> str:
-    """
-    Create a prompt that tells the model to generate a tailored resume in Markdown
-    in the requested language (English or German).
-    """
-    profile_text = json.dumps(profile, indent=2)
-    job_text = json.dumps(job, indent=2)
+# Resume-writing rules shared by the single-job and batch prompts
+_RESUME_REQUIREMENTS = """\
+- Focus on working student / junior software, data, or AI roles.
+- Start with a short professional summary tailored to the job.
+- Emphasize the most relevant skills for this specific job (hard skills first).
+- Reorder and selectively include experience and projects that best match the job description.
+- Use concise bullet points with strong action verbs and measurable impact where possible.
+- Use a neutral, professional tone.
+- Do NOT invent fake companies or degrees.
+- You may slightly rephrase tasks to better match the job wording, but keep them truthful."""
+
 
-    language_instruction = (
+def _language_instruction(target_language: str) -> str:
+    return (
         "Write the entire resume in fluent, professional English."
         if target_language.lower().startswith("en")
         else "Write the entire resume in fluent, professional German. Use clear, simple sentences suitable for a working student CV."
     )
 
+
+def build_resume_prompt(profile_text: str, job: dict, target_language: str) -> str:
+    """
+    Create a prompt that tells the model to generate a tailored resume in Markdown
+    in the requested language (English or German).
+    - profile_text: the candidate profile as JSON text (see load_profile_text)
+    """
+    job_text = _dumps(job)
+    language_instruction = _language_instruction(target_language)
+
     prompt = f"""
 You are an expert resume writer for software and AI roles.
 
@@ -89,14 +256,7 @@ Language:
 - {language_instruction}
 
 Requirements:
-- Focus on working student / junior software, data, or AI roles.
-- Start with a short professional summary tailored to the job.
-- Emphasize the most relevant skills for this specific job (hard skills first).
-- Reorder and selectively include experience and projects that best match the job description.
-- Use concise bullet points with strong action verbs and measurable impact where possible.
-- Use a neutral, professional tone.
-- Do NOT invent fake companies or degrees.
-- You may slightly rephrase tasks to better match the job wording, but keep them truthful.
+{_RESUME_REQUIREMENTS}
 - Output ONLY the resume in Markdown (no explanation, no preamble).
 
 CANDIDATE_PROFILE (JSON):
@@ -108,38 +268,241 @@ JOB_DESCRIPTION (JSON):
     return prompt
 
 
+def build_batch_prompt(profile_text: str, jobs: list, target_language: str) -> str:
+    """
+    Like build_resume_prompt, but asks for one resume per job in a single
+    generation, separated by RESUME_SEP lines. All jobs must share
+    target_language.
+    """
+    jobs_text = "\n\n".join(
+        f"JOB_DESCRIPTION {i} (JSON):\n{_dumps(job)}" for i, job in enumerate(jobs, 1)
+    )
+    language_instruction = _language_instruction(target_language)
+
+    prompt = f"""
+You are an expert resume writer for software and AI roles.
+
+Task:
+Using the CANDIDATE_PROFILE and the {len(jobs)} JOB_DESCRIPTIONs below, create {len(jobs)} tailored, one-to-two-page resumes in clean Markdown format, one per job, in the same order as the jobs.
+
+Language:
+- {language_instruction}
+
+Requirements (apply them to each resume and its own job):
+{_RESUME_REQUIREMENTS}
+- Separate consecutive resumes with a line containing exactly: {RESUME_SEP}
+- Output ONLY the {len(jobs)} resumes in Markdown (no explanation, no preamble).
+
+CANDIDATE_PROFILE (JSON):
+{profile_text}
+
+{jobs_text}
+"""
+    return prompt
+
+
 def sanitize_filename(text: str) -> str:
-    keep = "-_.() "
-    return "".join(c for c in text if c.isalnum() or c in keep).strip().replace(" ", "_")
+    return _SANITIZE_RE.sub("", text).strip().replace(" ", "_")
 
 
-def generate_tailored_resume(job: dict) -> str:
+def _prepare_job(profile_text: str, job: dict) -> str:
     """
-    Main function:
-    - job: dict with at least: title, company, location, description, url, platform, posted_date
-
-    Returns full path to generated Markdown file.
+    Detect the job language and build its prompt.
     """
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    profile = load_profile()
     jd_text = job.get("description", "") or ""
     target_language = detect_language(jd_text)
     print(f"🌐 Detected job description language: {target_language}")
+    return build_resume_prompt(profile_text, job, target_language)
 
-    prompt = build_resume_prompt(profile, job, target_language)
-    print(f"🧠 Calling Ollama model '{OLLAMA_MODEL}' to generate {target_language} resume...")
-    md_text = call_ollama(prompt)
 
+def _resume_path(job: dict, today: str) -> Path:
     company = job.get("company", "Company")
     title = job.get("title", "Role")
-    date_str = datetime.now().strftime("%Y%m%d")
 
-    filename = f"resume_{sanitize_filename(company)}_{sanitize_filename(title)}_{date_str}.md"
-    out_path = os.path.join(OUTPUT_DIR, filename)
+    filename = f"resume_{sanitize_filename(company)}_{sanitize_filename(title)}_{today}.md"
+    return OUTPUT_DIR / filename
+
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(md_text)
+def _already_generated(out_path: Path) -> bool:
+    """
+    True if out_path exists and REGENERATE isn't set.
+    """
+    if out_path.exists() and not os.getenv("REGENERATE"):
+        print(f"↩️  Resume already exists, skipping: {out_path}")
+        return True
+    return False
+
+
+@contextmanager
+def _open_partial(out_path: Path):
+    """
+    Open a temporary .md.part file next to out_path and move it onto out_path
+    only if the block completes, so a failed or interrupted generation never
+    leaves a file that a later run would mistake for a finished resume.
+    """
+    part_path = out_path.with_suffix(".md.part")
+    try:
+        with open(part_path, "w", encoding="utf-8") as f:
+            yield f
+        part_path.replace(out_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+async def _generate_one(prompt: str, out_path: Path, client: httpx.AsyncClient,
+                        limit: asyncio.Semaphore) -> Path:
+    """
+    Stream one resume into out_path. Returns None (after reporting the error)
+    if generation fails, so the other jobs of the run keep going.
+    """
+    try:
+        async with limit:
+            with _open_partial(out_path) as f:
+                await call_ollama_stream_async(prompt, client, f)
+    except Exception as e:
+        print(f"❌ Failed to generate {out_path.name}: {e!r}")
+        return None
+
+    print(f"✅ Tailored resume saved to: {out_path}")
+    return out_path
+
+
+async def _generate_batch(profile_text: str, batch: list, target_language: str,
+                          client: httpx.AsyncClient, limit: asyncio.Semaphore) -> list:
+    """
+    Generate several same-language resumes with one Ollama request and split
+    the result on RESUME_SEP. Falls back to one request per job if the model
+    doesn't return exactly one section per job. Returns the path per job,
+    None where generation failed.
+    """
+    prompt = build_batch_prompt(profile_text, [job for job, _ in batch], target_language)
+    try:
+        async with limit:
+            md_text = await call_ollama_async(prompt, client, timeout=OLLAMA_TIMEOUT * len(batch))
+    except Exception as e:
+        print(f"❌ Failed to generate batch of {len(batch)} resumes: {e!r}")
+        return [None] * len(batch)
+
+    sections = [part.strip() for part in md_text.split(RESUME_SEP)]
+    sections = [part for part in sections if part]
+
+    if len(sections) != len(batch):
+        print(f"⚠️  Expected {len(batch)} resumes in batch, got {len(sections)} - generating individually")
+        return await asyncio.gather(
+            *[_generate_one(build_resume_prompt(profile_text, job, target_language), out_path, client, limit)
+              for job, out_path in batch]
+        )
+
+    for (_, out_path), section in zip(batch, sections):
+        with _open_partial(out_path) as f:
+            f.write(section + "\n")
+        print(f"✅ Tailored resume saved to: {out_path}")
+    return [out_path for _, out_path in batch]
+
+
+def _collect_results(out_paths: list, done) -> list:
+    """
+    Map (out_path, result) pairs back onto out_paths, replacing failed jobs
+    with None and reporting how many failed.
+    """
+    failed = {out_path for out_path, result in done if result is None}
+    if failed:
+        print(f"⚠️  {len(failed)} resume(s) could not be generated")
+    return [None if out_path in failed else out_path for out_path in out_paths]
+
+
+async def generate_all(jobs: list, batch_size: int = 1, today: str = None) -> list:
+    """
+    Generate tailored resumes for many jobs concurrently.
+
+    Prompts are built up front, then the Ollama calls run concurrently (at
+    most OLLAMA_NUM_PARALLEL at a time) over a single pooled
+    httpx.AsyncClient, each streaming into its own Markdown file. Jobs whose
+    resume file already exists are skipped unless the REGENERATE environment
+    variable is set. Returns the output paths in job order, with None for
+    jobs whose generation failed.
+
+    With batch_size > 1, jobs are grouped by detected language and up to
+    batch_size (capped at MAX_BATCH_SIZE) resumes are requested per prompt,
+    so the shared profile prefix is sent and processed once per batch.
+
+    today: YYYYMMDD date stamp for the filenames; defaults to the current date.
+    """
+    today = today or datetime.now().strftime("%Y%m%d")
+    out_paths = [_resume_path(job, today) for job in jobs]
+
+    pending, scheduled = [], set()
+    for job, out_path in zip(jobs, out_paths):
+        if _already_generated(out_path):
+            continue
+        if out_path in scheduled:
+            # Same company/title/date (e.g. one posting on two platforms):
+            # generate once instead of two writers racing on one file
+            print(f"↩️  Duplicate job in batch, skipping: {out_path}")
+            continue
+        scheduled.add(out_path)
+        pending.append((job, out_path))
+
+    if not pending:
+        return out_paths
+
+    profile_text = load_profile_text()
+    limit = asyncio.Semaphore(max(1, OLLAMA_NUM_PARALLEL))
+
+    if batch_size > 1:
+        batch_size = min(batch_size, MAX_BATCH_SIZE)
+        by_language = {}
+        for job, out_path in pending:
+            target_language = detect_language(job.get("description", "") or "")
+            by_language.setdefault(target_language, []).append((job, out_path))
+
+        batches = [
+            (target_language, group[i:i + batch_size])
+            for target_language, group in by_language.items()
+            for i in range(0, len(group), batch_size)
+        ]
+        print(f"🧠 Calling Ollama model '{OLLAMA_MODEL}' for {len(pending)} resume(s) in {len(batches)} batch(es)...")
+
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                *[_generate_batch(profile_text, batch, target_language, client, limit)
+                  for target_language, batch in batches]
+            )
+        done = [(out_path, result)
+                for (_, batch), batch_results in zip(batches, results)
+                for (_, out_path), result in zip(batch, batch_results)]
+        return _collect_results(out_paths, done)
+
+    prompts = [_prepare_job(profile_text, job) for job, _ in pending]
+    print(f"🧠 Calling Ollama model '{OLLAMA_MODEL}' for {len(pending)} resume(s)...")
+
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(
+            *[_generate_one(prompt, out_path, client, limit) for (_, out_path), prompt in zip(pending, prompts)]
+        )
+
+    return _collect_results(out_paths, zip([out_path for _, out_path in pending], results))
+
+
+def generate_tailored_resume(job: dict, today: str = None) -> Path:
+    """
+    Main function:
+    - job: dict with at least: title, company, location, description, url, platform, posted_date
+    - today: optional YYYYMMDD filename date stamp (compute once when looping over jobs)
+
+    Streams through the pooled sync session; use generate_all for many jobs.
+    Returns full path to generated Markdown file.
+    """
+    today = today or datetime.now().strftime("%Y%m%d")
+    out_path = _resume_path(job, today)
+    if _already_generated(out_path):
+        return out_path
+
+    prompt = _prepare_job(load_profile_text(), job)
+    print(f"🧠 Calling Ollama model '{OLLAMA_MODEL}' to generate resume...")
+    with _open_partial(out_path) as f:
+        call_ollama_stream(prompt, f)
 
     print(f"✅ Tailored resume saved to: {out_path}")
     return out_path
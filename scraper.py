@@ -8,27 +8,70 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-import pandas as pd
+import soupsieve as sv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import openpyxl
 from datetime import datetime
 import time
 import random
 import os
+import re
+from functools import lru_cache
 
 EXCEL_FILE = "jobs.xlsx"
 
+HEADERS = [
+    'Job Title',
+    'Company',
+    'Location',
+    'Description',
+    'URL',
+    'Posted Date',
+    'Date Added',
+    'Applied',
+    'Application Date',
+    'Status',
+    'Notes'
+]
+
+# Class/href matchers for BeautifulSoup lookups, compiled once per process
+_RE_COMPANY = re.compile(r"company", re.I)
+_RE_LOCATION = re.compile(r"location", re.I)
+_RE_JOB = re.compile(r"job", re.I)
+_RE_BASE_CARD = re.compile(r"base-card")
+_RE_TITLE = re.compile(r"base-search-card__title")
+_RE_SUBTITLE = re.compile(r"base-search-card__subtitle")
+_RE_LOC = re.compile(r"job-search-card__location")
+_RE_JOB_VIEW = re.compile(r"/jobs/view/")
+
+# StepStone card fields, keyed on the stable data-at attributes
+_SEL_TITLE_LINK = sv.compile("a[href*='/stellenangebote']")
+_SEL_TITLE = sv.compile('[data-at="job-item-title"]')
+_SEL_COMPANY = sv.compile('[data-at="job-item-company-name"]')
+_SEL_LOCATION = sv.compile('[data-at="job-item-location"]')
+
+@lru_cache(maxsize=1)
+def _driver_path():
+    """
+    Resolve the chromedriver binary once per process.
+    Set CHROMEDRIVER_PATH to skip webdriver_manager entirely.
+    """
+    return os.getenv("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+
+
 def setup_driver():
     """
     Configure Chrome driver with anti-detection settings
     """
     chrome_options = Options()
     
+    chrome_options.add_argument('--headless=new')
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(_driver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -36,6 +79,75 @@ def setup_driver():
     return driver
 
 
+def _format_sheet(ws):
+    """
+    Apply column widths and freeze the header row.
+    Only needed on new sheets - the layout persists across saves.
+    """
+    column_widths = {
+        'A': 25,  # Job Title
+        'B': 20,  # Company
+        'C': 15,  # Location
+        'D': 30,  # Description
+        'E': 50,  # URL
+        'F': 12,  # Posted Date
+        'G': 12,  # Date Added
+        'H': 8,   # Applied
+        'I': 15,  # Application Date
+        'J': 12,  # Status
+        'K': 20   # Notes
+    }
+    
+    for col, width in column_widths.items():
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = 'A2'
+
+
+def _jitter():
+    """
+    Short random pause so requests don't look machine-timed
+    """
+    time.sleep(random.uniform(0.5, 1.2))
+
+
+def _wait_for(driver, locator, timeout=10):
+    """
+    Wait until an element matching locator is present, instead of a fixed sleep
+    """
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+    except Exception:
+        print(f"  ⚠️  Timeout waiting for {locator[1]}")
+    _jitter()
+
+
+def _click_and_wait_for_refresh(driver, element, timeout=10):
+    """
+    Click a control that reloads the result list and wait until the old
+    result cards are gone and new ones are present
+    """
+    old_results = driver.find_elements(By.TAG_NAME, "article")
+    element.click()
+    if old_results:
+        try:
+            WebDriverWait(driver, timeout).until(EC.staleness_of(old_results[0]))
+        except Exception:
+            print("  ⚠️  Results did not refresh")
+    _wait_for(driver, (By.TAG_NAME, "article"))
+
+
+def _scroll_and_wait_for_more(driver, locator, timeout=5):
+    """
+    Scroll to the bottom and wait until lazy-loaded cards increase the count
+    """
+    count = len(driver.find_elements(*locator))
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: len(d.find_elements(*locator)) > count)
+    except Exception:
+        pass  # nothing more to load
+
+
 def create_excel_if_not_exists():
     """
     Create Excel file with separate sheets for StepStone and LinkedIn ONLY
@@ -55,47 +167,13 @@ def create_excel_if_not_exists():
     print(f"📄 Creating new Excel file: {EXCEL_FILE}")
     
     # Create Excel with ONLY StepStone and LinkedIn sheets
-    with pd.ExcelWriter(EXCEL_FILE, engine='openpyxl') as writer:
-        for sheet_name in ['StepStone', 'LinkedIn']:
-            data = {
-                'Job Title': [],
-                'Company': [],
-                'Location': [],
-                'Description': [],
-                'URL': [],
-                'Posted Date': [],
-                'Date Added': [],
-                'Applied': [],
-                'Application Date': [],
-                'Status': [],
-                'Notes': []
-            }
-            
-            df = pd.DataFrame(data)
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
     
-    # Format the Excel file
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    
-    column_widths = {
-        'A': 25,  # Job Title
-        'B': 20,  # Company
-        'C': 15,  # Location
-        'D': 30,  # Description
-        'E': 50,  # URL
-        'F': 12,  # Posted Date
-        'G': 12,  # Date Added
-        'H': 8,   # Applied
-        'I': 15,  # Application Date
-        'J': 12,  # Status
-        'K': 20   # Notes
-    }
-    
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        ws.freeze_panes = 'A2'
+    for sheet_name in ['StepStone', 'LinkedIn']:
+        ws = wb.create_sheet(sheet_name)
+        ws.append(HEADERS)
+        _format_sheet(ws)
     
     wb.save(EXCEL_FILE)
     print(f"✅ Excel file created with StepStone and LinkedIn sheets only\n")
@@ -109,95 +187,74 @@ def read_existing_urls(sheet_name):
         return set()
     
     try:
-        df = pd.read_excel(EXCEL_FILE, sheet_name=sheet_name)
-        return set(df['URL'].dropna())
+        # Stream only the URL column (E) instead of loading the whole sheet
+        wb = openpyxl.load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet_name]
+            return {row[0] for row in ws.iter_rows(min_row=2, min_col=5, max_col=5, values_only=True) if row[0]}
+        finally:
+            wb.close()
     except Exception as e:
         print(f"⚠️  Error reading existing URLs from {sheet_name}: {e}")
         return set()
 
 
-def append_jobs_to_excel(new_jobs, platform):
+def append_jobs_to_excel(new_jobs, platform, wb=None):
     """
-    Append new jobs to the corresponding Excel sheet
+    Append new jobs to the corresponding Excel sheet.
+    Pass an open workbook to batch several platforms into a single save;
+    otherwise the workbook is opened and saved here.
     """
     if not new_jobs:
         print(f"⚠️  No new jobs to add for {platform}")
         return
     
-    sheet_name = platform
+    owns_wb = wb is None
+    if owns_wb:
+        wb = openpyxl.load_workbook(EXCEL_FILE)
     
-    # Read existing data from the specific sheet
-    try:
-        df_existing = pd.read_excel(EXCEL_FILE, sheet_name=sheet_name)
-    except:
-        df_existing = pd.DataFrame()
+    if platform not in wb.sheetnames:
+        # e.g. a legacy 'Jobs'-only workbook - add the platform sheet
+        ws = wb.create_sheet(platform)
+        ws.append(HEADERS)
+        _format_sheet(ws)
+    else:
+        ws = wb[platform]
+    
+    # Remove duplicates (if job URL already exists, skip it)
+    existing_urls = {row[0] for row in ws.iter_rows(min_row=2, min_col=5, max_col=5, values_only=True) if row[0]}
     
-    # Create dataframe from new jobs
     today = datetime.now().strftime("%Y-%m-%d")
-    new_data = []
+    added = 0
     
     for job in new_jobs:
-        new_data.append({
-            'Job Title': job['title'],
-            'Company': job['company'],
-            'Location': job['location'],
-            'Description': job['description'],
-            'URL': job['url'],
-            'Posted Date': job['posted_date'],
-            'Date Added': today,
-            'Applied': 'No',
-            'Application Date': '',
-            'Status': 'New',
-            'Notes': ''
-        })
-    
-    df_new = pd.DataFrame(new_data)
-    
-    # Remove duplicates (if job URL already exists, skip it)
-    if not df_existing.empty:
-        existing_urls = set(df_existing['URL'].dropna())
-        df_new = df_new[~df_new['URL'].isin(existing_urls)]
-    
-    if df_new.empty:
+        if job['url'] in existing_urls:
+            continue
+        ws.append([
+            job['title'],
+            job['company'],
+            job['location'],
+            job['description'],
+            job['url'],
+            job['posted_date'],
+            today,
+            'No',   # Applied
+            '',     # Application Date
+            'New',  # Status
+            ''      # Notes
+        ])
+        existing_urls.add(job['url'])
+        added += 1
+    
+    if not added:
         print(f"✅ All {platform} jobs are duplicates - no new jobs added")
         return
     
-    # Append to existing data
-    if df_existing.empty:
-        df_combined = df_new
-    else:
-        df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-    
-    # Write back to Excel - need to rewrite entire workbook
-    with pd.ExcelWriter(EXCEL_FILE, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-        df_combined.to_excel(writer, sheet_name=sheet_name, index=False)
-    
-    # Re-apply formatting
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    ws = wb[sheet_name]
-    
-    column_widths = {
-        'A': 25,
-        'B': 20,
-        'C': 15,
-        'D': 30,
-        'E': 50,
-        'F': 12,
-        'G': 12,
-        'H': 8,
-        'I': 15,
-        'J': 12,
-        'K': 20
-    }
+    if owns_wb:
+        wb.save(EXCEL_FILE)
     
-    for col, width in column_widths.items():
-        ws.column_dimensions[col].width = width
-    
-    ws.freeze_panes = 'A2'
-    wb.save(EXCEL_FILE)
-    
-    print(f"✅ Added {len(df_new)} new {platform} jobs to {EXCEL_FILE}")
-    print(f"📊 Total {platform} jobs in Excel: {len(df_combined)}")
+    print(f"✅ Added {added} new {platform} jobs to {EXCEL_FILE}")
+    print(f"📊 Total {platform} jobs in Excel: {ws.max_row - 1}")
 
 
 def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", max_pages=2):
@@ -205,7 +262,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
     Scrape StepStone for job listings with English and 24-hour filters
     Extracts DIRECT job URLs by clicking on each job
     """
-    jobs = []
+    jobs, seen_urls = [], set()
     print(f"\n🔍 [STEPSTONE] Searching: {search_term} in {location}")
     
     try:
@@ -215,7 +272,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
         
         print(f"  🌐 Loading StepStone: {url}")
         driver.get(url)
-        time.sleep(random.uniform(4, 6))
+        _wait_for(driver, (By.TAG_NAME, "article"))
         
         # Accept cookies if present
         try:
@@ -224,7 +281,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
             )
             cookie_button.click()
             print("  🍪 Accepted cookies")
-            time.sleep(2)
+            _jitter()
         except:
             print("  ℹ️  No cookie banner found")
         
@@ -234,8 +291,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
             time_filter = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), '24') or contains(@aria-label, '24 Stunden')]"))
             )
-            time_filter.click()
-            time.sleep(2)
+            _click_and_wait_for_refresh(driver, time_filter)
             print("  ✅ 24-hour filter applied")
         except Exception as e:
             print(f"  ⚠️  Could not apply 24-hour filter: {e}")
@@ -247,7 +303,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
             try:
                 filter_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Filter') or contains(text(), 'Alle Filter')]")
                 filter_button.click()
-                time.sleep(2)
+                _jitter()
             except:
                 pass
             
@@ -255,13 +311,12 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
                 EC.element_to_be_clickable((By.XPATH, "//label[contains(text(), 'Englisch') or contains(text(), 'English')]"))
             )
             english_checkbox.click()
-            time.sleep(2)
+            _jitter()
             print("  ✅ English language filter applied")
             
             try:
                 apply_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Anwenden') or contains(text(), 'Apply')]")
-                apply_button.click()
-                time.sleep(3)
+                _click_and_wait_for_refresh(driver, apply_button)
             except:
                 pass
             
@@ -278,7 +333,7 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
                     else:
                         next_url = f"{current_url}?page={page}"
                     driver.get(next_url)
-                    time.sleep(random.uniform(3, 5))
+                    _jitter()
                 
                 print(f"  📄 Scraping page {page}...")
                 
@@ -290,21 +345,25 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
                     print(f"  ⚠️  Timeout waiting for job cards")
                     break
                 
-                # Get job card elements with Selenium to extract proper URLs
-                job_card_elements = driver.find_elements(By.TAG_NAME, "article")
+                # Parse the whole page once instead of one parser per card
+                page_soup = BeautifulSoup(driver.page_source, 'lxml')
+                job_cards = page_soup.find_all('article')
                 
-                if not job_card_elements:
+                if not job_cards:
                     print(f"  ⚠️  No jobs found on page {page}")
                     break
                 
-                print(f"  ✅ Found {len(job_card_elements)} jobs")
+                print(f"  ✅ Found {len(job_cards)} jobs")
                 
-                for card in job_card_elements:
+                for card in job_cards:
                     try:
                         # Get the title link
-                        title_link = card.find_element(By.XPATH, ".//a[contains(@href, '/stellenangebote')]")
-                        job_title = title_link.text.strip()
-                        job_url = title_link.get_attribute('href')
+                        title_link = _SEL_TITLE_LINK.select_one(card)
+                        if not title_link:
+                            continue
+                        title_elem = _SEL_TITLE.select_one(card) or title_link
+                        job_title = title_elem.get_text(strip=True)
+                        job_url = title_link.get('href')
                         
                         if not job_url:
                             continue
@@ -313,29 +372,27 @@ def scrape_stepstone(driver, search_term="werkstudent IT", location="Berlin", ma
                         if not job_url.startswith('http'):
                             job_url = 'https://www.stepstone.de' + job_url
                         
-                        # Parse with BeautifulSoup for other fields
-                        soup = BeautifulSoup(str(card.get_attribute('outerHTML')), 'html.parser')
-                        
-                        # Company
-                        company_elem = soup.find('span', class_=lambda x: x and 'company' in str(x).lower() if x else False)
+                        # Company (fall back to class names if data-at changes)
+                        company_elem = _SEL_COMPANY.select_one(card) or card.find('span', class_=_RE_COMPANY)
                         if not company_elem:
-                            company_elem = soup.find_all('span')
+                            company_elem = card.find_all('span')
                             company_elem = company_elem[1] if len(company_elem) > 1 else None
                         company = company_elem.get_text(strip=True) if company_elem else "N/A"
                         
                         # Location
-                        location_elem = soup.find('span', class_=lambda x: x and 'location' in str(x).lower() if x else False)
+                        location_elem = _SEL_LOCATION.select_one(card) or card.find('span', class_=_RE_LOCATION)
                         job_location = location_elem.get_text(strip=True) if location_elem else location
                         
                         # Description
-                        desc_elem = soup.find('p')
+                        desc_elem = card.find('p')
                         description = desc_elem.get_text(strip=True) if desc_elem else ""
                         
                         # Posted date
-                        date_elem = soup.find('time')
+                        date_elem = card.find('time')
                         posted_date = date_elem.get('datetime', 'N/A') if date_elem else "N/A"
                         
-                        if not any(j['url'] == job_url for j in jobs):
+                        if job_url not in seen_urls:
+                            seen_urls.add(job_url)
                             jobs.append({
                                 'title': job_title,
                                 'company': company,
@@ -367,7 +424,7 @@ def scrape_linkedin(driver, search_term="werkstudent IT", location="Berlin", max
     """
     Scrape LinkedIn for job listings with 24-hour filter
     """
-    jobs = []
+    jobs, seen_urls = [], set()
     print(f"\n🔍 [LINKEDIN] Searching: {search_term} in {location}")
     
     for page in range(max_pages):
@@ -377,17 +434,16 @@ def scrape_linkedin(driver, search_term="werkstudent IT", location="Berlin", max
             print(f"  📄 Page {page + 1}: Past 24 hours filter active")
             
             driver.get(url)
-            time.sleep(random.uniform(4, 6))
+            _wait_for(driver, (By.CSS_SELECTOR, "div.base-card"))
             
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            _scroll_and_wait_for_more(driver, (By.CSS_SELECTOR, "div.base-card"))
             
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = BeautifulSoup(driver.page_source, 'lxml')
             
-            job_cards = soup.find_all('div', class_=lambda x: x and 'base-card' in x if x else False)
+            job_cards = soup.find_all('div', class_=_RE_BASE_CARD)
             
             if not job_cards:
-                job_cards = soup.find_all('li', class_=lambda x: x and 'job' in str(x).lower() if x else False)
+                job_cards = soup.find_all('li', class_=_RE_JOB)
             
             if not job_cards:
                 print(f"  ⚠️  No jobs found")
@@ -397,32 +453,33 @@ def scrape_linkedin(driver, search_term="werkstudent IT", location="Berlin", max
             
             for card in job_cards:
                 try:
-                    title_elem = card.find('h3', class_=lambda x: x and 'base-search-card__title' in x if x else False)
+                    title_elem = card.find('h3', class_=_RE_TITLE)
                     if not title_elem:
-                        title_elem = card.find('a', href=lambda x: x and '/jobs/view/' in x if x else False)
+                        title_elem = card.find('a', href=_RE_JOB_VIEW)
                     
                     if not title_elem:
                         continue
                     
                     job_title = title_elem.get_text(strip=True)
                     
-                    link_elem = card.find('a', href=lambda x: x and '/jobs/view/' in x if x else False)
+                    link_elem = card.find('a', href=_RE_JOB_VIEW)
                     job_url = link_elem['href'] if link_elem else None
                     if job_url and not job_url.startswith('http'):
                         job_url = 'https://www.linkedin.com' + job_url
                     
-                    company_elem = card.find('h4', class_=lambda x: x and 'base-search-card__subtitle' in x if x else False)
+                    company_elem = card.find('h4', class_=_RE_SUBTITLE)
                     if not company_elem:
-                        company_elem = card.find('a', class_=lambda x: x and 'company' in str(x).lower() if x else False)
+                        company_elem = card.find('a', class_=_RE_COMPANY)
                     company = company_elem.get_text(strip=True) if company_elem else "N/A"
                     
-                    location_elem = card.find('span', class_=lambda x: x and 'job-search-card__location' in x if x else False)
+                    location_elem = card.find('span', class_=_RE_LOC)
                     job_location = location_elem.get_text(strip=True) if location_elem else location
                     
                     date_elem = card.find('time')
                     posted_date = date_elem.get('datetime', 'N/A') if date_elem else "24h"
                     
-                    if job_url and not any(j['url'] == job_url for j in jobs):
+                    if job_url and job_url not in seen_urls:
+                        seen_urls.add(job_url)
                         jobs.append({
                             'title': job_title,
                             'company': company,
@@ -447,27 +504,50 @@ def scrape_linkedin(driver, search_term="werkstudent IT", location="Berlin", max
     return jobs
 
 
-def scrape_all_platforms(search_terms=["werkstudent IT"], location="Berlin", max_pages=2):
+def _run_platform(scraper, search_terms, location, max_pages):
     """
-    Scrape StepStone and LinkedIn
+    Run one platform scraper for all search terms on its own browser
     """
-    print("🚀 Starting Multi-Platform Job Scraper (24-hour filter active)")
-    print("=" * 80)
-    
-    stepstone_jobs = []
-    linkedin_jobs = []
+    jobs = []
     driver = setup_driver()
     
     try:
         for search_term in search_terms:
-            stepstone_jobs.extend(scrape_stepstone(driver, search_term, location, max_pages))
-            linkedin_jobs.extend(scrape_linkedin(driver, search_term, location, max_pages))
+            jobs.extend(scraper(driver, search_term, location, max_pages))
     
     finally:
         driver.quit()
-        print("\n🔒 Browser closed")
+        print(f"\n🔒 Browser closed ({scraper.__name__})")
     
-    return stepstone_jobs, linkedin_jobs
+    return jobs
+
+
+def scrape_all_platforms(search_terms=["werkstudent IT"], location="Berlin", max_pages=2):
+    """
+    Scrape StepStone and LinkedIn concurrently, one browser per platform
+    """
+    print("🚀 Starting Multi-Platform Job Scraper (24-hour filter active)")
+    print("=" * 80)
+    
+    results = {'StepStone': [], 'LinkedIn': []}
+    
+    # Resolve the driver before starting threads so it is installed only once
+    _driver_path()
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            executor.submit(_run_platform, scrape_stepstone, search_terms, location, max_pages): 'StepStone',
+            executor.submit(_run_platform, scrape_linkedin, search_terms, location, max_pages): 'LinkedIn'
+        }
+        
+        for future in as_completed(futures):
+            platform = futures[future]
+            try:
+                results[platform] = future.result()
+            except Exception as e:
+                print(f"  ❌ Error in {platform} scraper: {e}")
+    
+    return results['StepStone'], results['LinkedIn']
 
 
 if __name__ == "__main__":
@@ -497,8 +577,10 @@ if __name__ == "__main__":
     print("UPDATING EXCEL FILE")
     print("=" * 80)
     
-    append_jobs_to_excel(stepstone_jobs, 'StepStone')
-    append_jobs_to_excel(linkedin_jobs, 'LinkedIn')
+    wb = openpyxl.load_workbook(EXCEL_FILE)
+    append_jobs_to_excel(stepstone_jobs, 'StepStone', wb)
+    append_jobs_to_excel(linkedin_jobs, 'LinkedIn', wb)
+    wb.save(EXCEL_FILE)
     
     # Show sample results
     print("\n" + "=" * 80)